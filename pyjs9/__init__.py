@@ -4,14 +4,25 @@ pyjs9.py: connects Python and JS9 via the JS9 (back-end) helper
 from __future__ import print_function
 
 import time
+import copy
 import json
+import heapq
+import itertools
+import types
+import numbers
 import base64
+import binascii
 import logging
 from traceback import format_exc
-from threading import Condition
-from io import BytesIO
+from collections import namedtuple
+from threading import Condition, Event, Lock, Thread
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from io import BytesIO, StringIO
+from importlib.util import find_spec
 
 import requests
+from requests.adapters import HTTPAdapter
 
 __all__ = ['JS9', 'js9Globals']
 
@@ -43,14 +54,33 @@ js9Globals['output_verify'] = 'ignore'
 # array allows us to deal with larger images
 js9Globals['retrieveAs'] = 'array'
 
+# cache the results of getters for state that only changes when this client
+# changes it (see _CACHE_CMDS): off by default, since changes made in the
+# browser (e.g. zooming with the mouse) are not seen while a result is cached
+js9Globals['cache'] = False
+# seconds after which a cached result expires (None: only when a command that
+# might change the state is sent), to limit how stale browser changes can be
+js9Globals['cacheTTL'] = None
+
 # how to turn on logging at most verbose level:
 # logging.basicConfig(level=logging.DEBUG)
 
+def _have(name):
+    """
+    Check whether a module is installed, without importing it
+    """
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
 # load fits, if available
-try:
-    from astropy.io import fits
+# astropy.io.fits is slow to import, so it only is imported on first use
+fits = None
+if _have('astropy'):
     js9Globals['fits'] = 1
-except ImportError:
+else:
     try:
         import pyfits as fits
         if fits.__version__ >= '2.2':
@@ -60,159 +90,633 @@ except ImportError:
     except ImportError:
         js9Globals['fits'] = 0
 
-# load numpy, if available
-try:
-    import numpy
+# load numpy, if available (also imported on first use)
+if _have('numpy'):
     js9Globals['numpy'] = 1
-except ImportError:
+else:
     js9Globals['numpy'] = 0
 
-# load socket.io, if available
-try:
-    import socketio
+# load socket.io, if available (imported when the first JS9 object connects)
+if _have('socketio'):
     logging.info('set socketio transport')
     js9Globals['transport'] = 'socketio'
     js9Globals['wait'] = 10
-except ImportError:
+else:
     logging.info('no python-socketio, use html transport')
     js9Globals['transport'] = 'html'
     js9Globals['wait'] = 0
 
-# utilities
-def _decode_list(data):
-    rv = []
-    for item in data:
-        if isinstance(item, list):
-            item = _decode_list(item)
-        elif isinstance(item, dict):
-            item = _decode_dict(item)
-        rv.append(item)
-    return rv
-
-
-def _decode_dict(data):
-    rv = {}
-    for key, value in data.items():
-        if isinstance(value, list):
-            value = _decode_list(value)
-        elif isinstance(value, dict):
-            value = _decode_dict(value)
-        rv[key] = value
-    return rv
+# use orjson for the html transport's JSON encoding/decoding, if available
+try:
+    import orjson
+    js9Globals['orjson'] = 1
+except ImportError:
+    js9Globals['orjson'] = 0
+
+# use pybase64 (SIMD-accelerated) for image data base64 encoding/decoding,
+# if available
+try:
+    import pybase64
+    js9Globals['pybase64'] = 1
+    # pybase64 picks its SIMD codec (AVX2, SSE4, NEON, ...) at import time:
+    # the version string reports which one is active
+    logging.info('use pybase64 %s', pybase64.get_version())
+except ImportError:
+    logging.info('no pybase64, use base64')
+    js9Globals['pybase64'] = 0
+
+
+# getters whose results are cached when js9Globals['cache'] is set: any
+# other command sent empties the cache, since it might change the state
+_CACHE_CMDS = frozenset((
+    'GetZoom', 'GetPan', 'GetScale', 'GetFlip', 'GetRotate', 'GetRot90',
+    'GetWCSUnits', 'GetWCSSys', 'GetOpacity', 'GetRGBMode',
+    'GetShapes', 'GetRegions', 'ListRegions', 'ListGroups',
+    'GetAnalysis', 'GetFITSHeader', 'GetToolbar',
+))
+# region getters and the position of their "which" arg: they are only cached
+# when it is given, since the default is the selected regions
+_WHICH_ARG = {'GetRegions': 0, 'ListRegions': 0, 'GetShapes': 1}
+# command-style routines that are getters when called without arguments
+_CACHE_GETTERS = frozenset(('helper', 'image', 'wcssys', 'wcsu'))
+
+# lists of what JS9 supports: these don't change (except colormaps, when one
+# is added), so they are always fetched just once, cached or not (see
+# JS9.clear_caps_cache())
+_CAPS_CMDS = frozenset(('colormaps', 'scales', 'wcssystems', 'wcsunits'))
+
+# commands that add to one of the lists above, and the list they change
+_CAPS_CHANGERS = {'AddColormap': 'colormaps', 'LoadColormap': 'colormaps'}
+
+# command-style setters that can be combined in a configure() call
+_CONFIGURE_CMDS = frozenset((
+    'colormap', 'scale', 'pan', 'zoom', 'region', 'regions', 'resize',
+    'wcssys', 'wcsu',
+))
+
+
+def _json_default(o):
+    """
+    Encode objects that json does not know about (e.g. numpy arrays and
+    numpy scalars, as found in region coordinates or colormap arrays)
+    """
+    tolist = getattr(o, 'tolist', None)
+    if tolist is not None:
+        return tolist()
+    raise TypeError('Object of type %s is not JSON serializable'
+                    % type(o).__name__)
+
+
+class _SocketioJSON:
+    """
+    json codec for pyjs9's python-socketio packets, which also encodes numpy
+    values, using orjson (if available) as with the html transport
+    """
+    @staticmethod
+    def dumps(obj, **kwargs):
+        """
+        Encode obj as a json string, as json.dumps
+        """
+        if js9Globals['orjson']:
+            try:
+                # orjson output always is compact (socketio's separators)
+                return orjson.dumps(obj, default=_json_default,
+                                    option=orjson.OPT_SERIALIZE_NUMPY).decode()
+            except TypeError:
+                # something orjson can't encode: let json try
+                pass
+        kwargs.setdefault('default', _json_default)
+        return json.dumps(obj, **kwargs)
+
+    @staticmethod
+    def loads(s, **kwargs):
+        """
+        Decode a json string, as json.loads
+        """
+        if js9Globals['orjson'] and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+
+def _b64encode(buf):
+    """
+    Base64-encode a bytes-like object, returning an ascii string
+    """
+    if js9Globals['pybase64']:
+        # encodes straight into a str, skipping the bytes -> str copy
+        return pybase64.b64encode_as_string(buf)
+    return base64.b64encode(buf).decode('ascii')
+
+
+def _b64decode(s):
+    """
+    Decode a base64 string (or bytes), returning bytes
+    """
+    if js9Globals['pybase64']:
+        try:
+            return pybase64.b64decode(s, validate=True)
+        except binascii.Error:
+            # e.g. embedded newlines: these are skipped by binascii
+            pass
+    # a2b_base64 reads an ascii str directly: no encode() copy
+    return binascii.a2b_base64(s)
+
+
+def _load_fits():
+    """
+    Return the fits module, importing astropy.io.fits on first use (or
+    pyfits, if astropy is installed but fails to import)
+    """
+    # pylint: disable=global-statement, invalid-name, redefined-outer-name
+    # pylint: disable=import-outside-toplevel
+    global fits
+    if fits is None:
+        try:
+            from astropy.io import fits
+        except ImportError:
+            try:
+                import pyfits
+            except ImportError:
+                pyfits = None
+            if pyfits is None or pyfits.__version__ < '2.2':
+                js9Globals['fits'] = 0
+                raise ValueError('fits not defined (astropy.io.fits failed '
+                                 'to import, and pyfits not found)') from None
+            fits = pyfits
+            js9Globals['fits'] = 2
+    return fits
 
 
 # numpy-dependent routines
 if js9Globals['numpy']:
-    def _bp2np(bitpix):  # pylint: disable=too-many-return-statements
+    # numpy and the tables that depend on it are set up by _load_numpy()
+    numpy = None
+    _BP2NP = _NP2BP = _NP_TYPE_MAP = _NP_CVT = None
+
+    def _load_numpy():
+        """
+        Import numpy on first use and set up the type conversion tables
+        """
+        # pylint: disable=global-statement, invalid-name, redefined-outer-name
+        # pylint: disable=import-outside-toplevel
+        global numpy, _BP2NP, _NP2BP, _NP_TYPE_MAP, _NP_CVT
+        if numpy is not None:
+            return numpy
+        import numpy
+        # FITS bitpix <-> numpy datatype
+        _BP2NP = {
+            8: numpy.uint8,
+            16: numpy.int16,
+            32: numpy.int32,
+            64: numpy.int64,
+            -32: numpy.float32,
+            -64: numpy.float64,
+            -16: numpy.uint16,
+        }
+        _NP2BP = {numpy.dtype(v): k for k, v in _BP2NP.items()}
+        # numpy datatypes not supported by JS9 are converted to ones that are
+        _NP_TYPE_MAP = (
+            # pylint: disable=bad-whitespace
+            (numpy.uint8  , numpy.uint8,  ),
+            (numpy.int8   , numpy.int16,  ),
+            (numpy.uint16 , numpy.uint16, ),
+            (numpy.int16  , numpy.int16,  ),
+            (numpy.int32  , numpy.int32,  ),
+            (numpy.uint32 , numpy.int64,  ),
+            (numpy.int64  , numpy.int64,  ),
+            (numpy.float16, numpy.float32,),
+            (numpy.float32, numpy.float32,),
+            (numpy.float64, numpy.float64,),
+        )
+        # native numpy datatype -> (datatype sent to JS9, its bitpix)
+        _NP_CVT = {numpy.dtype(t[0]): (t[1], _NP2BP[numpy.dtype(t[1])])
+                   for t in _NP_TYPE_MAP}
+        return numpy
+
+    def _bp2np(bitpix):
         """
         Convert FITS bitpix to numpy datatype
         """
-        if bitpix == 8:
-            return numpy.uint8
-        if bitpix == 16:
-            return numpy.int16
-        if bitpix == 32:
-            return numpy.int32
-        if bitpix == 64:
-            return numpy.int64
-        if bitpix == -32:
-            return numpy.float32
-        if bitpix == -64:
-            return numpy.float64
-        if bitpix == -16:
-            return numpy.uint16
-        raise ValueError('unsupported bitpix: %d' % bitpix)
-
-    _NP_TYPE_MAP = (
-        # pylint: disable=bad-whitespace
-        (numpy.uint8  , numpy.uint8,  ),
-        (numpy.int8   , numpy.int16,  ),
-        (numpy.uint16 , numpy.uint16, ),
-        (numpy.int16  , numpy.int16,  ),
-        (numpy.int32  , numpy.int32,  ),
-        (numpy.uint32 , numpy.int64,  ),
-        (numpy.int64  , numpy.int64,  ),
-        (numpy.float16, numpy.float32,),
-        (numpy.float32, numpy.float32,),
-        (numpy.float64, numpy.float64,),
-    )
-
-    def _cvt2np(ndarr: numpy.ndarray):
-        # NOTE cvt2np may be merged into np2bp
+        try:
+            return _BP2NP[bitpix]
+        except KeyError:
+            raise ValueError('unsupported bitpix: %d' % bitpix) from None
+
+    def _cvt2np(ndarr: 'numpy.ndarray'):
+        """
+        Convert array to a datatype supported by JS9, returning it and its
+        FITS bitpix
+        """
         dtype = ndarr.dtype
-        for t in _NP_TYPE_MAP:
-            if numpy.issubdtype(dtype, t[0]):
-                return ndarr.astype(t[1])
-        return ndarr
+        target = _NP_CVT.get(dtype)
+        if target is None:
+            # not a native dtype in the table (e.g. byte-swapped): probe
+            for t in _NP_TYPE_MAP:
+                if numpy.issubdtype(dtype, t[0]):
+                    target = _NP_CVT[numpy.dtype(t[0])]
+                    break
+            else:
+                return ndarr, _np2bp(dtype)
+        # no copy if the array already has the target type (and layout):
+        # otherwise, convert and make it C-contiguous in the same pass
+        return ndarr.astype(target[0], order='C', copy=False), target[1]
 
-    def _np2bp(dtype):  # pylint: disable=too-many-return-statements
+    def _np2bp(dtype):
         """
         Convert numpy datatype to FITS bitpix
         """
-        if dtype == numpy.uint8:
-            return 8
-        if dtype == numpy.int16:
-            return 16
-        if dtype == numpy.int32:
-            return 32
-        if dtype == numpy.int64:
-            return 64
-        if dtype == numpy.float32:
-            return -32
-        if dtype == numpy.float64:
-            return -64
-        if dtype == numpy.uint16:
-            return -16
-        raise ValueError('unsupported dtype: %s' % dtype)
-
-    def _bp2py(bitpix):  # pylint: disable=too-many-return-statements
-        """
-        Convert FITS bitpix to python datatype
-        """
-        if bitpix == 8:
-            return 'B'
-        if bitpix == 16:
-            return 'h'
-        if bitpix == 32:
-            return 'l'
-        if bitpix == 64:
-            return 'q'
-        if bitpix == -32:
-            return 'f'
-        if bitpix == -64:
-            return 'd'
-        if bitpix == -16:
-            return 'H'
-        raise ValueError('unsupported bitpix: %d' % bitpix)
+        try:
+            return _NP2BP[numpy.dtype(dtype)]
+        except (KeyError, TypeError):
+            raise ValueError('unsupported dtype: %s' % dtype) from None
+
+    def _frombuf(buf, bitpix, shape):
+        """
+        Return a view of raw JS9 pixel data as a numpy array of given shape
+        """
+        # JS9 pixels are little-endian typed array data: view them in place,
+        # byte swapping (i.e., copying) only on a big-endian host
+        dtype = numpy.dtype(_bp2np(bitpix)).newbyteorder('<')
+        count = 1
+        for n in shape:
+            count *= n
+        arr = numpy.frombuffer(buf, dtype=dtype, count=count).reshape(shape)
+        if not dtype.isnative:
+            arr = arr.astype(dtype.newbyteorder('='))
+        return arr
+
+    def _np_column(col):
+        """
+        Return a list of region property values as a 1-D numpy array
+        """
+        # all numbers (or None) or all strings, but not a mix: numpy would
+        # turn the numbers into strings
+        if all(v is None or isinstance(v, numbers.Number) for v in col) or \
+           all(isinstance(v, str) for v in col):
+            return numpy.asarray(col)
+        # e.g. vertex lists (possibly of different lengths), dicts or mixed
+        # values: keep one object per region, rather than letting numpy nest
+        # or convert them
+        arr = numpy.empty(len(col), dtype=object)
+        for i, v in enumerate(col):
+            arr[i] = v
+        return arr
 
     def _im2np(im):
         """
         Convert GetImageData object to numpy
         """
+        _load_numpy()
         w = int(im['width'])
         h = int(im['height'])
         d = 1
         bp = int(im['bitpix'])
         dtype = _bp2np(bp)
-        dlen = h * w * abs(bp) // 8
+        shape = (d, h, w) if d > 1 else (h, w)
         if js9Globals['retrieveAs'] == 'array':
-            s = im['data'][0:h*w]
-            if d > 1:
-                arr = numpy.array(s, dtype=dtype).reshape((d, h, w))
-            else:
-                arr = numpy.array(s, dtype=dtype).reshape((h, w))
+            s = im['data']
+            if len(s) != d*h*w:
+                s = s[0:d*h*w]
+            arr = numpy.array(s, dtype=dtype).reshape(shape)
         elif js9Globals['retrieveAs'] == 'base64':
-            s = base64.decodebytes(im['data'].encode())[0:dlen]
-            if d > 1:
-                arr = numpy.frombuffer(s, dtype=dtype).reshape((d, h, w))
-            else:
-                arr = numpy.frombuffer(s, dtype=dtype).reshape((h, w))
+            s = _b64decode(im['data'])
+            arr = _frombuf(s, bp, shape)
         else:
             raise ValueError('unknown retrieveAs type for GetImageData()')
         return arr
 
 
-class JS9:
+def _coalesce_key(obj):
+    """
+    Return a key for a setter call that is overridden by a following call
+    with the same key (so that a run of them can be merged), else None
+    """
+    cmd = obj.get('cmd')
+    args = list(obj.get('args') or ())
+    # trailing opts (e.g. the display) must be the same too
+    opts = args.pop() if args and isinstance(args[-1], dict) else None
+    nums = all(isinstance(a, numbers.Real) and not isinstance(a, bool)
+               for a in args)
+    # only absolute settings: SetZoom('x2'), SetZoom('in') etc. are relative
+    if cmd == 'SetPan' and len(args) == 2 and nums:
+        pass
+    elif cmd == 'SetZoom' and len(args) == 1 and \
+         (nums or str(args[0]).lower() == 'tofit'):
+        pass
+    elif cmd == 'SetColormap' and len(args) == 2 and nums:
+        # contrast, bias
+        pass
+    else:
+        return None
+    return (cmd, opts)
+
+
+def _obj_key(obj):
+    """
+    Return the cache key of a command object, or None if it has none
+    """
+    try:
+        key = tuple(obj.items())
+        hash(key)
+    except TypeError:
+        # unhashable args (e.g. opts): the command's canonical json (keys
+        # sorted) serves as the key instead
+        try:
+            key = json.dumps(obj, sort_keys=True, default=_json_default,
+                             separators=(',', ':'))
+        except (TypeError, ValueError):
+            return None
+    return key
+
+
+def _is_write(obj, msg):
+    """
+    Return whether a command might change the state (i.e. it is not one of
+    the getters in _CACHE_CMDS or _CACHE_GETTERS), so that it empties the
+    cache
+    """
+    if msg != 'msg':
+        return False
+    cmd = obj.get('cmd')
+    return not (cmd in _CACHE_CMDS or
+                (cmd in _CACHE_GETTERS and not obj.get('args')))
+
+
+def _copied_future(future):
+    """
+    Return a new Future, resolved with a copy of the result of another
+    Future (or with its exception) when that one is done
+    """
+    copied = Future()
+
+    def done(f):
+        if f.cancelled():
+            copied.cancel()
+        elif f.exception() is not None:
+            copied.set_exception(f.exception())
+        else:
+            copied.set_result(copy.deepcopy(f.result()))
+    future.add_done_callback(done)
+    return copied
+
+
+# parsed replies of the command-style getters, see _parse_reply()
+Pan = namedtuple('Pan', 'x y')
+Size = namedtuple('Size', 'width height')
+Scale = namedtuple('Scale', 'scale min max')
+Cmap = namedtuple('Cmap', 'colormap contrast bias')
+
+
+def _parse_reply(cls, res):
+    """
+    Return the string reply of a command-style getter (e.g. 'x y') as a
+    namedtuple, with its numbers converted to int or float
+    """
+    if hasattr(res, 'add_done_callback'):
+        # a Future from a JS9Proxy: there is no reply to parse yet
+        raise ValueError('parsed=True is not supported through batch(), '
+                         'futures() or aio()')
+    parts = str(res).split(None, len(cls._fields) - 1)
+    if len(parts) != len(cls._fields):
+        raise ValueError('unexpected reply: %s' % res)
+    vals = []
+    for part in parts:
+        for conv in (int, float):
+            try:
+                part = conv(part)
+                break
+            except ValueError:
+                pass
+        vals.append(part)
+    return cls(*vals)
+
+
+def _table_str(table):
+    """
+    Return a table object (an astropy Table or a pandas DataFrame) as the
+    tab-delimited text expected by LoadCatalog, or anything else as it is
+    """
+    if isinstance(table, (str, bytes)):
+        return table
+    to_csv = getattr(table, 'to_csv', None)
+    if to_csv is not None:
+        # pandas DataFrame
+        return to_csv(sep='\t', index=False)
+    if hasattr(table, 'colnames') and hasattr(table, 'write'):
+        # astropy Table
+        buf = StringIO()
+        table.write(buf, format='ascii.tab')
+        return buf.getvalue()
+    return table
+
+
+# deadlines of the socketio replies in flight: (time, seq, callback) heap,
+# checked by a single thread rather than a timer thread per command
+_deadlines = []
+_deadline_seq = itertools.count()
+_deadline_cv = Condition()
+_deadline_thread = None
+
+
+def _at_deadline(delay, func):
+    """
+    Call func() after delay seconds, from the shared deadline thread
+    """
+    # pylint: disable=global-statement
+    global _deadline_thread
+    when = time.monotonic() + delay
+    with _deadline_cv:
+        heapq.heappush(_deadlines, (when, next(_deadline_seq), func))
+        if _deadline_thread is None:
+            _deadline_thread = Thread(target=_run_deadlines,
+                                      name='pyjs9-deadlines', daemon=True)
+            _deadline_thread.start()
+        _deadline_cv.notify()
+
+
+def _run_deadlines():
+    """
+    Call the callbacks in _deadlines as they fall due
+    """
+    while True:
+        with _deadline_cv:
+            while True:
+                delay = _deadlines[0][0] - time.monotonic() \
+                    if _deadlines else None
+                if delay is not None and delay <= 0:
+                    break
+                _deadline_cv.wait(delay)
+            func = heapq.heappop(_deadlines)[2]
+        try:
+            func()
+        except Exception:  # pylint: disable=broad-except
+            logging.error(format_exc())
+
+
+# JS9 methods that process the results they get back, so that they can't be
+# called through a JS9Proxy (where send() returns a Future, not the result)
+_RESULT_METHODS = frozenset((
+    'GetFITS', 'GetNumpy', 'GetDisplayNumpy', 'GetRegionsArrays', 'image_all',
+))
+
+
+class JS9Proxy:  # pylint: disable=too-few-public-methods
+    """
+    Call JS9 methods with the commands they send redirected to the
+    proxy's own send() and sendmany() methods
+    """
+
+    def __init__(self, js9):
+        self._js9 = js9
+
+    def __getattr__(self, name):
+        if name in _RESULT_METHODS:
+            raise ValueError('%s processes its results, so it can\'t be called '
+                             'through batch(), futures() or aio()' % name)
+        # JS9 methods bound to the proxy, so that their send() calls go to
+        # the proxy
+        attr = getattr(type(self._js9), name, None)
+        if isinstance(attr, types.FunctionType):
+            return types.MethodType(attr, self)
+        return getattr(self._js9, name)
+
+
+class JS9Futures(JS9Proxy):
+    """
+    Send JS9 commands without waiting for their results: see JS9.futures()
+    """
+
+    def send(self, obj, msg='msg'):
+        """
+        Send a command object, returning a Future for its result
+        """
+        return self._js9.send_async(obj, msg=msg)
+
+    def sendmany(self, objs, msg='msg'):
+        """
+        Send a list of command objects, returning a list of Futures
+        """
+        return [self.send(obj, msg=msg) for obj in objs]
+
+
+class JS9Aio(JS9Proxy):
+    """
+    Send JS9 commands from asyncio code, awaiting their results: see
+    JS9.aio()
+    """
+
+    def send(self, obj, msg='msg'):
+        """
+        Send a command object, returning an awaitable asyncio Future for its
+        result
+        """
+        # asyncio is slow to import, and only needed here
+        import asyncio  # pylint: disable=import-outside-toplevel
+        return asyncio.wrap_future(self._js9.send_async(obj, msg=msg))
+
+    def sendmany(self, objs, msg='msg'):
+        """
+        Send a list of command objects, returning an awaitable for the list
+        of their results
+        """
+        import asyncio  # pylint: disable=import-outside-toplevel
+        return asyncio.gather(*[self.send(obj, msg=msg) for obj in objs])
+
+
+class JS9Batch(JS9Proxy):
+    """
+    Queue JS9 commands and send them together: see JS9.batch()
+    """
+
+    def __init__(self, js9, coalesce=False):
+        super().__init__(js9)
+        self.coalesce = coalesce
+        self.cmds = []
+        self.results = None
+        # index into cmds and future of each queued call, last call's key
+        self._slots = []
+        self._futures = []
+        self._last_key = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            # nothing is sent: don't leave the queued calls' Futures pending
+            self.cancel()
+
+    def cancel(self):
+        """
+        Discard the queued commands, cancelling the Futures of their calls
+        """
+        futures = self._futures
+        self.cmds, self._slots, self._futures = [], [], []
+        self._last_key = None
+        for future in futures:
+            future.cancel()
+
+    def send(self, obj, msg='msg'):
+        """
+        Queue a command object (instead of sending it), returning a
+        Future for its result
+        """
+        if msg != 'msg':
+            raise ValueError('only commands can be batched, not %s' % msg)
+        if obj is None:
+            obj = {}
+        key = _coalesce_key(obj) if self.coalesce else None
+        if key is not None and key == self._last_key:
+            # the previous call is overridden by this one: replace it
+            self.cmds[-1] = obj
+        else:
+            self.cmds.append(obj)
+        self._last_key = key
+        self._slots.append(len(self.cmds) - 1)
+        future = Future()
+        self._futures.append(future)
+        return future
+
+    def sendmany(self, objs, msg='msg'):
+        """
+        Queue a list of command objects, returning a list of Futures
+        """
+        return [self.send(obj, msg=msg) for obj in objs]
+
+    def flush(self):
+        """
+        Send the queued commands and return their results
+
+        The results are also saved in the results property, and are set
+        in the Futures returned by the queued calls. A call that returns an
+        error gets it in its own Future (and as its entry in results), and
+        the first error is raised once all of the Futures are set.
+        """
+        cmds, slots, futures = self.cmds, self._slots, self._futures
+        self.cmds, self._slots, self._futures = [], [], []
+        self._last_key = None
+        try:
+            results = self._js9._sendmany(cmds)  # pylint: disable=protected-access
+        except Exception as e:
+            for future in futures:
+                future.set_exception(e)
+            raise
+        # merged calls share the result of the call that replaced them
+        self.results = [results[i] for i in slots]
+        for future, res in zip(futures, self.results):
+            if isinstance(res, Exception):
+                future.set_exception(res)
+            else:
+                future.set_result(res)
+        for res in results:
+            if isinstance(res, Exception):
+                raise res
+        return self.results
+
+
+class JS9:  # pylint: disable=too-many-instance-attributes
     """
     The JS9 class supports communication with an instance of JS9 in a web
     page, utilizing the JS9 Public API calls as class methods.
@@ -225,10 +729,22 @@ class JS9:
     access to/from well-known Python objects:
 
     - GetNumpy: retrieve a FITS image or an array into a numpy array
+    - GetDisplayNumpy: retrieve all images in the display into numpy arrays
     - SetNumpy: send a numpy array to JS9 for display
     - GetFITS: retrieve a FITS image into an astropy (or pyfits) HDU list
     - SetFITS: send a astropy (or pyfits) HDU list to JS9 for display
 
+    and to convert many positions at once:
+
+    - PixToWCSMany: convert lists of image positions to WCS positions
+    - WCSToPixMany: convert lists of WCS positions to image positions
+
+    and to work with many regions at once:
+
+    - AddRegionsArrays: add regions from arrays of region properties
+    - GetRegionsArrays: get arrays of region properties
+    - ChangeRegionsArrays: change regions from arrays of region properties
+
     """
 
     def __init__(self, host='http://localhost:2718', id='JS9', multi=False, pageid=None, maxtries=5, delay=1, debug=False):  # pylint: disable=redefined-builtin, too-many-arguments, line-too-long
@@ -264,19 +780,47 @@ class JS9:
         self.__dict__['host'] = host
         self.__dict__['multi'] = multi
         self.__dict__['pageid'] = pageid
+        # persistent http session, so that the html transport reuses its
+        # connection to the helper (keep-alive) instead of opening a new one
+        # for every command
+        self._http = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._http.mount('http://', adapter)
+        self._http.mount('https://', adapter)
         # open socket.io connection, if necessary
         if js9Globals['transport'] == 'socketio':
             try:
+                import socketio  # pylint: disable=import-outside-toplevel
+                # numpy values in command args are encoded, as with html.
+                # The codec is set on a packet class of our own: the json
+                # argument of socketio.Client would replace it in the shared
+                # socketio and engineio packet classes, i.e. for every
+                # socketio client and server in the process
+                packet_class = type('_SocketioPacket',
+                                    (socketio.packet.Packet,),
+                                    {'json': _SocketioJSON})
                 if debug:
                     self.sockio = socketio.Client(logger=True,
-                                                  engineio_logger=True)
+                                                  engineio_logger=True,
+                                                  serializer=packet_class)
                 else:
-                    self.sockio = socketio.Client()
+                    self.sockio = socketio.Client(serializer=packet_class)
                 self.sockio.connect(host)
             except Exception as e:  # pylint: disable=broad-except
                 logging.warning('socketio connect failed: %s, using html', e)
                 js9Globals['transport'] = 'html'
-        self._block_cb = None
+        # json of html commands without args, see _post()
+        self._frames = {}
+        # cached getter results (see js9Globals['cache']), their generation
+        # (bumped whenever the cache is emptied) and the getters in flight
+        self._cache = {}
+        self._cache_gen = 0
+        self._inflight = {}
+        self._lock = Lock()
+        # threads for send_async() with the html transport, made on demand
+        self._executor = None
+        # lists of available colormaps etc., see _CAPS_CMDS
+        self._caps = {}
         # wait for connect be ready, but success doesn't really matter here
         tries = 0
         while tries < maxtries:
@@ -298,23 +842,91 @@ class JS9:
         """
         self.__dict__[itemname] = value
         if itemname in ('host', 'id',):
+            # results cached for the previous JS9 instance don't apply
+            self.clear_caps_cache()
+            self._clear_cache()
             self._alive()
 
+    def clear_caps_cache(self):
+        """
+        Forget the lists of available colormaps, scales, wcs systems and
+        wcs units, so that they are fetched from JS9 again
+
+        These lists are fetched only once, since they seldom change. They
+        are refreshed after this object adds a colormap, but not when one is
+        added some other way (e.g. by another JS9 object or in the browser):
+        then call clear_caps_cache() before calling colormaps() again.
+        """
+        self._caps.clear()
+
+    def _caps_get(self, obj):
+        """
+        An internal routine to return one of the lists in _CAPS_CMDS,
+        fetching it on first use
+        """
+        cmd = obj['cmd']
+        res = self._caps.get(cmd)
+        if res is None:
+            res = self._transmit(obj, 'msg')
+            # '' is what a socketio timeout returns: don't keep it
+            if res != '':
+                self._caps[cmd] = res
+        return res
+
+    def _caps_sent(self, obj):
+        """
+        An internal routine to drop a cached list changed by a command
+        """
+        name = _CAPS_CHANGERS.get(obj.get('cmd'))
+        if name is not None:
+            self._caps.pop(name, None)
+
     def _alive(self):
         """
         An internal routine to send a test message to the helper
         """
         self.send(None, msg='alive')
 
-    def sockioCB(self, *args):
+    def _prep(self, obj):
         """
-        Internal routine
+        An internal routine to add display info to a command object
         """
-        logging.debug('socketio callback, args: %s', args)
-        self.__dict__['sockioResult'] = args[0]
-        self._block_cb.acquire()
-        self._block_cb.notify()
-        self._block_cb.release()
+        obj['id'] = self.__dict__['id']
+        obj['multi'] = self.__dict__['multi']
+        if self.__dict__['pageid'] is not None:
+            obj['pageid'] = self.__dict__['pageid']
+
+    def _post(self, url, obj):
+        """
+        An internal routine to post a command object to the helper as json
+        """
+        # commands without args (e.g. getters polled by a GUI) always encode
+        # the same way: reuse their json
+        key = data = None
+        if not obj.get('args'):
+            try:
+                key = tuple(obj.items())
+                data = self._frames.get(key)
+            except TypeError:
+                # unhashable values: just encode it
+                key = None
+        if data is None:
+            if js9Globals['orjson']:
+                try:
+                    data = orjson.dumps(obj, default=_json_default,
+                                        option=orjson.OPT_SERIALIZE_NUMPY)
+                except TypeError:
+                    # something orjson can't encode: let json try
+                    pass
+            if data is None:
+                # compact, like orjson (and socketio): no padding after
+                # each of the (many) commas in pixel and vertex lists
+                data = json.dumps(obj, default=_json_default,
+                                  separators=(',', ':'))
+            if key is not None:
+                self._frames[key] = data
+        return self._http.post(url, data=data, headers={
+            'Content-Type': 'application/json'})
 
     def send(self, obj, msg='msg'):
         """
@@ -331,43 +943,479 @@ class JS9:
         """
         if obj is None:
             obj = {}
-        obj['id'] = self.__dict__['id']
-        obj['multi'] = self.__dict__['multi']
-        if self.__dict__['pageid'] is not None:
-            obj['pageid'] = self.__dict__['pageid']
+        self._prep(obj)
+        cmd = obj.get('cmd')
+        if cmd in _CAPS_CMDS and not obj.get('args') and msg == 'msg':
+            return self._caps_get(obj)
+        key = self._cache_key(obj, msg) if js9Globals['cache'] else None
+        if key is None:
+            try:
+                return self._transmit(obj, msg)
+            finally:
+                # getters sent while a command that changes the state was in
+                # flight might have cached the state from before it
+                if js9Globals['cache'] and _is_write(obj, msg):
+                    self._clear_cache()
+        try:
+            return self._cache_get(key)
+        except KeyError:
+            pass
+        # if the same getter is already in flight (e.g. in another thread),
+        # share its reply rather than sending it again
+        while True:
+            with self._lock:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._inflight[key] = Future()
+                    gen = self._cache_gen
+                    break
+            try:
+                # a copy: the caller that sent it gets the reply itself
+                return copy.deepcopy(
+                    future.result(timeout=js9Globals['wait'] or None))
+            except FutureTimeoutError:
+                # no reply in time (e.g. a lost socketio ack): drop the
+                # stalled call, so that it is sent again
+                with self._lock:
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+        try:
+            res = self._transmit(obj, msg)
+        except Exception as e:
+            self._cache_done(key, gen, future, exc=e)
+            raise
+        self._cache_done(key, gen, future, res=res)
+        return res
+
+    def _cache_done(self, key, gen, future, res=None,
+                    exc=None):  # pylint: disable=too-many-arguments
+        """
+        An internal routine to cache the reply of a getter in flight (unless
+        a command sent meanwhile emptied the cache) and pass it on to any
+        callers waiting for the same getter
+        """
+        with self._lock:
+            # '' is what a socketio timeout returns: don't keep it
+            if exc is None and res != '' and gen == self._cache_gen:
+                ttl = js9Globals['cacheTTL']
+                # a copy, so that callers can modify the lists and dicts
+                # they get back without changing the cached result
+                self._cache[key] = (copy.deepcopy(res), None if ttl is None
+                                    else time.monotonic() + ttl)
+            # no longer in flight (unless the cache was emptied and the
+            # getter was sent again meanwhile)
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+        if exc is None:
+            future.set_result(res)
+        else:
+            future.set_exception(exc)
+
+    def _cache_get(self, key):
+        """
+        An internal routine to return (a copy of) a cached getter result,
+        raising KeyError if there is none (or it has expired)
+        """
+        res, expires = self._cache[key]
+        if expires is not None and time.monotonic() > expires:
+            raise KeyError(key)
+        return copy.deepcopy(res)
 
-        if js9Globals['transport'] == 'html': # pylint: disable=no-else-return
+    def _clear_cache(self):
+        """
+        An internal routine to empty the getter cache (calls in flight then
+        are no longer shared with new callers, nor are their replies cached)
+        """
+        with self._lock:
+            self._cache_gen += 1
+            self._cache.clear()
+            self._inflight.clear()
+
+    def _transmit(self, obj, msg):
+        """
+        An internal routine to send a prepared command object via the
+        current transport and return the result
+        """
+        self._caps_sent(obj)
+        if js9Globals['transport'] == 'html':
             host = self.__dict__['host']
             try:
-                url = requests.post(host + '/' + msg, json=obj)
+                url = self._post(host + '/' + msg, obj)
             except IOError as e:
                 raise IOError('Cannot connect to {0}: {1}'.format(host, e))
-            urtn = url.text
-            if 'ERROR:' in urtn:
-                raise ValueError(urtn)
+            # work with the raw reply: decoding it to text is only needed
+            # for errors and for replies that are not json
+            urtn = url.content
+            if b'ERROR:' in urtn:
+                raise ValueError(url.text)
             try:
-                # TODO: url.json() decode the json for us:
-                # http://www.python-requests.org/en/latest/user/quickstart/#json-response-content
-                # res = url.json()
-                res = json.loads(urtn, object_hook=_decode_dict)
+                if js9Globals['orjson']:
+                    res = orjson.loads(urtn)
+                else:
+                    res = json.loads(urtn)
             except ValueError:   # not json
-                res = urtn
-                if isinstance(res, str):
-                    res = res.strip()
-            return res
+                res = url.text.strip()
         else:
-            self.__dict__['sockioResult'] = ''
-            self._block_cb = Condition()
-            self._block_cb.acquire()
-            self.sockio.emit('msg', obj, callback=self.sockioCB)
-            self._block_cb.wait(timeout=js9Globals['wait'])
-            self._block_cb.release()
-#            self.sockio.wait_for_callbacks(seconds=js9Globals['wait'])
-            if self.__dict__['sockioResult'] and \
-               isinstance(self.__dict__['sockioResult'], str) and \
-               'ERROR:' in self.__dict__['sockioResult']:
-                raise ValueError(self.__dict__['sockioResult'])
-            return self.__dict__['sockioResult']
+            # each call waits on its own reply, so that threads can share
+            # the one persistent connection without mixing up the results
+            reply = ['']
+            ready = Event()
+
+            def cb(*args):
+                logging.debug('socketio callback, args: %s', args)
+                reply[0] = args[0] if args else ''
+                ready.set()
+            self.sockio.emit('msg', obj, callback=cb)
+            ready.wait(timeout=js9Globals['wait'])
+            res = self.__dict__['sockioResult'] = reply[0]
+            if res and isinstance(res, str) and 'ERROR:' in res:
+                raise ValueError(res)
+        return res
+
+    def _cache_key(self, obj, msg):
+        """
+        An internal routine to return the cache key of a cached getter,
+        emptying the cache for any other command (then None)
+        """
+        if msg != 'msg':
+            return None
+        if not _is_write(obj, msg):
+            args = obj.get('args') or ()
+            # the selection changes with the mouse, not just via commands
+            if any(isinstance(a, str) and 'selected' in a for a in args):
+                return None
+            which = _WHICH_ARG.get(obj.get('cmd'))
+            if which is not None and \
+               (len(args) <= which or not isinstance(args[which], str)):
+                return None
+            return _obj_key(obj)
+        self._clear_cache()
+        return None
+
+    def send_nowait(self, obj, msg='msg'):
+        """
+        :obj: dictionary containing command and args keys
+
+        Send a command without waiting for its reply. With the socketio
+        transport, the command is emitted without asking for a reply at
+        all, so that a run of setters costs no round trips. Commands are
+        still run in the order they are sent, but their results and errors
+        are not reported. (The html transport can't skip the reply: there,
+        send_nowait() calls send() and discards the result.)
+
+        >>> js9.send_nowait({'cmd': 'SetColormap', 'args': ['red']})
+        """
+        if js9Globals['transport'] == 'html':
+            self.send(obj, msg=msg)
+            return
+        if obj is None:
+            obj = {}
+        self._prep(obj)
+        self._clear_cache()
+        self._caps_sent(obj)
+        self.sockio.emit('msg', obj)
+
+    def send_async(self, obj, msg='msg'):
+        """
+        :obj: dictionary containing command and args keys
+
+        :rtype: concurrent.futures.Future for the returned data or info
+
+        Send a command without waiting for its result, returning a Future
+        instead. Independent commands then can be in flight at the same
+        time, with their round trips overlapping, rather than one after the
+        other. With the socketio transport, the Future is resolved by the
+        command's reply callback; the html transport sends the command from
+        a small pool of threads. An error returned by the command is raised
+        by the Future's result():
+
+        >>> f = js9.send_async({'cmd': 'GetZoom'})
+        >>> f.result()
+        1
+
+        With the socketio transport, if no reply arrives within
+        js9Globals['wait'] seconds, the Future's result() raises a
+        concurrent.futures.TimeoutError.
+        """
+        if js9Globals['transport'] == 'html':
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=4, thread_name_prefix='pyjs9')
+            return self._executor.submit(self.send, obj, msg=msg)
+        if obj is None:
+            obj = {}
+        self._prep(obj)
+        future = Future()
+        if not obj.get('args') and obj.get('cmd') in self._caps:
+            future.set_result(self._caps[obj['cmd']])
+            return future
+        key = self._cache_key(obj, msg) if js9Globals['cache'] else None
+        # a command that might change the state empties the cache again once
+        # it is done (see send())
+        write = js9Globals['cache'] and _is_write(obj, msg)
+        gen = None
+        if key is not None:
+            with self._lock:
+                try:
+                    future.set_result(self._cache_get(key))
+                    return future
+                except KeyError:
+                    pass
+                # share the reply of the same getter in flight (a copy, as
+                # with send(), so that callers don't share one result)
+                if key in self._inflight:
+                    return _copied_future(self._inflight[key])
+                self._inflight[key] = future
+                gen = self._cache_gen
+
+        # the reply or the timeout, whichever comes first, resolves the
+        # future (ack callbacks are never called if the reply is lost)
+        claim = Lock()
+        wait = js9Globals['wait']
+
+        def cb(*args):
+            logging.debug('socketio callback, args: %s', args)
+            if not claim.acquire(blocking=False):  # pylint: disable=consider-using-with
+                return
+            res = args[0] if args else ''
+            exc = None
+            if res and isinstance(res, str) and 'ERROR:' in res:
+                exc = ValueError(res)
+            if write:
+                self._clear_cache()
+            if key is not None:
+                self._cache_done(key, gen, future, res=res, exc=exc)
+            elif exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(res)
+
+        def expire():
+            if not claim.acquire(blocking=False):  # pylint: disable=consider-using-with
+                return
+            if write:
+                self._clear_cache()
+            if key is not None:
+                with self._lock:
+                    if self._inflight.get(key) is future:
+                        del self._inflight[key]
+            future.set_exception(FutureTimeoutError(
+                'no reply from JS9 within %s seconds' % wait))
+        self._caps_sent(obj)
+        self.sockio.emit('msg', obj, callback=cb)
+        if wait:
+            # a deadline that falls after the reply does nothing
+            _at_deadline(wait, expire)
+        return future
+
+    def sendmany(self, objs, msg='msg'):
+        """
+        :objs: list of dictionaries containing command and args keys
+
+        :rtype: list of returned data or info, one for each command
+
+        Send a list of commands, returning their results in the same order.
+        With the socketio transport, the commands are all sent before any
+        reply is awaited, so that they share a single round trip to the
+        browser, rather than paying for one round trip each. (The html
+        transport sends them one after the other.) An error returned by
+        any command raises a ValueError, as with send():
+
+        >>> js9.sendmany([{'cmd': 'SetColormap', 'args': ['red']},
+                          {'cmd': 'GetZoom'}])
+        ['OK', 1]
+        """
+        results = self._sendmany(objs, msg=msg)
+        for res in results:
+            if isinstance(res, Exception):
+                raise res
+        return results
+
+    def _sendmany(self, objs, msg='msg'):
+        """
+        An internal routine to send a list of commands (see sendmany()),
+        returning the result of each one, or the exception for a command
+        that returned an error
+        """
+        objs = [{} if obj is None else obj for obj in objs]
+        if js9Globals['transport'] == 'html' or not objs:
+            results = []
+            for obj in objs:
+                try:
+                    results.append(self.send(obj, msg=msg))
+                except Exception as e:  # pylint: disable=broad-except
+                    results.append(e)
+            return results
+        results = [''] * len(objs)
+        pending = [len(objs)]
+        lock = Lock()
+        ready = Event()
+
+        def callback(i):
+            def cb(*args):
+                logging.debug('socketio callback %d, args: %s', i, args)
+                results[i] = args[0] if args else ''
+                with lock:
+                    pending[0] -= 1
+                ready.set()
+            return cb
+        # the commands might change cached state
+        self._clear_cache()
+        try:
+            for i, obj in enumerate(objs):
+                self._prep(obj)
+                self._caps_sent(obj)
+                self.sockio.emit('msg', obj, callback=callback(i))
+            # wait as long as replies keep arriving
+            while pending[0] and ready.wait(timeout=js9Globals['wait']):
+                ready.clear()
+        finally:
+            # getters sent while the commands were in flight might have
+            # cached the state from before them
+            self._clear_cache()
+        return [ValueError(res)
+                if res and isinstance(res, str) and 'ERROR:' in res else res
+                for res in results]
+
+    def batch(self, coalesce=False):
+        """
+        :param coalesce: merge runs of calls that override each other
+        :rtype: JS9Batch context manager
+
+        Inside a with block, calls made through the batch object are queued
+        and then sent together via sendmany() when the block is exited. The
+        results of the queued calls are available afterwards as a list:
+
+        >>> with js9.batch() as b:
+                b.SetColormap('red')
+                b.SetScale('log')
+                zoom = b.GetZoom()
+        >>> b.results
+        ['OK', 'OK', 2]
+
+        Each queued call returns a concurrent.futures.Future, whose result()
+        is available once the batch has been sent:
+
+        >>> zoom.result()
+        2
+
+        If the with block raises an exception, nothing is sent and the
+        queued calls' Futures are cancelled (see JS9Batch.cancel()). If a
+        sent call returns an error, only its own Future raises it, and the
+        first such error is raised when the block exits.
+
+        Only calls whose results are not used by other calls in the block
+        can be batched. Methods that process the results they get back
+        (GetFITS, GetNumpy, GetDisplayNumpy, GetRegionsArrays and
+        image_all) can't be batched at all, and raise a ValueError, as do
+        the command-style getters (colormap, cmap, pan, resize and scale)
+        when called with parsed=True.
+
+        With coalesce=True, a run of consecutive calls that each override
+        the last (e.g. SetPan(x, y), SetZoom(zoom) or SetColormap(contrast,
+        bias) while tracking a slider or the mouse) is sent as the final
+        call alone, since the end state is the same. Relative changes such
+        as SetZoom('x2') are always sent.
+        """
+        return JS9Batch(self, coalesce=coalesce)
+
+    def futures(self):
+        """
+        :rtype: JS9Futures proxy
+
+        Calls made through the proxy are sent via send_async(), returning
+        a concurrent.futures.Future instead of waiting for the result:
+
+        >>> f = js9.futures()
+        >>> zoom, pan = f.GetZoom(), f.GetPan()
+        >>> zoom.result(), pan.result()
+        (2, {'x': 512, 'y': 512, ...})
+
+        As with batch(), methods that process the results they get back
+        (GetFITS, GetNumpy, GetDisplayNumpy, GetRegionsArrays, image_all,
+        and command-style getters with parsed=True) can't be called through
+        the proxy.
+        """
+        return JS9Futures(self)
+
+    def aio(self):
+        """
+        :rtype: JS9Aio proxy
+
+        Calls made through the proxy are sent via send_async() and return
+        awaitables, so that asyncio code can wait for several independent
+        calls at once, rather than one after the other:
+
+        >>> a = js9.aio()
+        >>> zoom, pan = await asyncio.gather(a.GetZoom(), a.GetPan())
+
+        The proxy must be called from a running event loop. As with
+        futures(), methods that process the results they get back (GetFITS,
+        GetNumpy, GetDisplayNumpy, GetRegionsArrays, image_all, and
+        command-style getters with parsed=True) can't be called through it.
+        """
+        return JS9Aio(self)
+
+    def gather(self, *calls):
+        """
+        :param calls: methods (or method names) to call without arguments,
+          or tuples containing a method (or name) and its arguments
+        :rtype: dictionary of results, keyed by method name
+
+        Make several independent calls (typically getters) in a batch, so
+        that they share a single round trip, and return their results by
+        name:
+
+        >>> js9.gather(js9.GetZoom, js9.GetPan, (js9.GetScale, {'display': 'JS9'}))
+        {'GetZoom': 1, 'GetPan': {...}, 'GetScale': {...}}
+
+        As with batch(), the calls can't depend on each other's results.
+        Since the results are keyed by name, each method can only be called
+        once (a ValueError is raised otherwise): use batch() to make the same
+        call with different arguments.
+        """
+        names, futures = [], []
+        with self.batch() as b:
+            for call in calls:
+                args = ()
+                if isinstance(call, tuple):
+                    call, args = call[0], call[1:]
+                name = call if isinstance(call, str) else call.__name__
+                if name in names:
+                    raise ValueError('%s called more than once in gather()'
+                                     % name)
+                names.append(name)
+                futures.append(getattr(b, name)(*args))
+        # e.g. PixToWCSMany() returns a list of futures
+        return {name: [f.result() for f in future]
+                if isinstance(future, list) else future.result()
+                for name, future in zip(names, futures)}
+
+    def configure(self, **kw):
+        """
+        :param kw: command-style setters (colormap, scale, pan, zoom, region,
+          regions, resize, wcssys, wcsu) and their args (a tuple for
+          several args)
+        :rtype: list of results, in the order of the keywords
+
+        Set up the display with several command-style setters at once,
+        sending them via sendmany(), so that (with the socketio transport)
+        they share a single round trip:
+
+        >>> js9.configure(colormap='heat', scale='log', pan=(512, 512),
+                          zoom=4, regions='circle 100 100 20')
+        ['OK', 'OK', 'OK', 'OK', 'OK']
+
+        The setters are sent in the order of the keywords.
+        """
+        objs = []
+        for name, args in kw.items():
+            if name not in _CONFIGURE_CMDS:
+                raise ValueError('unknown configure setting: %s' % name)
+            if not isinstance(args, tuple):
+                args = (args,)
+            objs.append({'cmd': name, 'args': args})
+        return self.sendmany(objs)
 
     def close(self):
         """
@@ -378,6 +1426,11 @@ class JS9:
                 self.sockio.disconnect()
             except Exception as e:  # pylint: disable=broad-except
                 logging.error('socketio close failed: %s', e)
+        if self._executor is not None:
+            self._executor.shutdown()
+        self._http.close()
+        self.clear_caps_cache()
+        self._clear_cache()
 
     if js9Globals['fits']:
         def GetFITS(self):
@@ -406,14 +1459,17 @@ class JS9:
             arr = _im2np(im)
             # add fits cards
             # create FITS primary hdu from numpy array
+            _load_fits()
             hdu = fits.PrimaryHDU(arr)
             hdulist = fits.HDUList([hdu])
             return hdulist
 
-        def SetFITS(self, hdul, name=None):
+        def SetFITS(self, hdul, name=None, opts=None):
             """
             :param hdul: fits hdulist
             :param name: fits file or object name (used as id)
+            :param opts: dictionary of JS9 Load() options (e.g. display,
+              colormap, scale)
 
             After manipulating or otherwise modifying a fits hdulist (or
             making a new one), you can display it in js9 using the 'SetFITS'
@@ -429,6 +1485,7 @@ class JS9:
             """
             if not js9Globals['fits']:
                 raise ValueError('SetFITS not defined (fits not found)')
+            _load_fits()
             if not isinstance(hdul, fits.HDUList):
                 if js9Globals['fits'] == 1:
                     raise ValueError('requires astropy.HDUList as input')
@@ -437,10 +1494,12 @@ class JS9:
             memstr = BytesIO()
             # write fits to memory string
             hdul.writeto(memstr, output_verify=js9Globals['output_verify'])
-            # get memory string as an encoded string
-            encstr = base64.b64encode(memstr.getvalue()).decode()
+            # get memory string as an encoded string, encoding directly from
+            # the BytesIO buffer instead of a getvalue() copy of it
+            with memstr.getbuffer() as buf:
+                encstr = _b64encode(buf)
             # set up JS9 options
-            opts = {}
+            opts = dict(opts) if opts else {}
             if name:
                 opts['filename'] = name
             # send encoded file to JS9 for display
@@ -492,11 +1551,36 @@ class JS9:
             arr = _im2np(im)
             return arr
 
-        def SetNumpy(self, arr, filename=None, dtype=None):
+        def GetDisplayNumpy(self):
+            """
+            :rtype: list of numpy arrays
+
+            To read all of the images loaded into the js9 display, use the
+            'GetDisplayNumpy' method. It takes no arguments and returns a
+            list of np arrays, one for each image::
+
+              >>> arrs = j.GetDisplayNumpy()
+              >>> [arr.shape for arr in arrs]
+              [(1024, 1024), (2048, 2048)]
+
+            All of the images are retrieved in a single call to JS9, rather
+            than calling GetNumpy() once for each image.
+            """
+            # get image data for all images in the display from JS9
+            imarr = self.GetDisplayData(js9Globals['retrieveAs'])
+            # if the images are too large, we can get back an empty string
+            if imarr == '':
+                raise ValueError('GetDisplayData failed: images too large for Python transport?')
+            # convert each to numpy
+            return [_im2np(im) for im in imarr]
+
+        def SetNumpy(self, arr, filename=None, dtype=None, opts=None):
             """
             :param arr: numpy array
             :param name: file or object name (used as id)
             :param dtype: data type into which to convert array before sending
+            :param opts: dictionary of JS9 Load() options (e.g. display,
+              colormap, scale)
 
             After manipulating or otherwise modifying a numpy array (or making
             a new one), you can display it in js9 using the 'SetNumpy' method,
@@ -523,29 +1607,39 @@ class JS9:
 
               >>>> j.RefreshImage(arr.tolist())
             """
+            _load_numpy()
             if not isinstance(arr, numpy.ndarray):
                 raise ValueError('requires numpy.ndarray as input')
             if dtype and dtype != arr.dtype:
-                narr = arr.astype(dtype)
+                narr = arr.astype(dtype, order='C', copy=False)
+                bp = _np2bp(narr.dtype)
             else:
-                narr = _cvt2np(arr)
+                narr, bp = _cvt2np(arr)
 
             if not narr.flags['C_CONTIGUOUS']:
                 narr = numpy.ascontiguousarray(narr)
             # parameters to pass back to JS9
-            bp = _np2bp(narr.dtype)
             (h, w) = narr.shape
             dmin = narr.min().tolist()
             dmax = narr.max().tolist()
-            # base64-encode numpy array in native format
-            encarr = base64.b64encode(narr.tostring()).decode()
+            # base64-encode numpy array in native format, reading straight
+            # from the array buffer instead of making a bytes copy
+            encarr = _b64encode(memoryview(narr).cast('B'))
             # create object to send to JS9 containing encoded array
             hdu = {'naxis': 2, 'naxis1': w, 'naxis2': h, 'bitpix': bp,
                    'dmin': dmin, 'dmax': dmax, 'encoding': 'base64',
                    'image': encarr}
+            # a filename in opts (e.g. from load()) names the image, as in
+            # SetFITS, rather than being passed on as a Load() option
+            if opts and 'filename' in opts:
+                opts = dict(opts)
+                name = opts.pop('filename')
+                filename = filename or name
             if filename:
                 hdu['filename'] = filename
             # send encoded file to JS9 for display
+            if opts:
+                return self.Load(hdu, opts)
             return self.Load(hdu)
 
     else:
@@ -556,6 +1650,13 @@ class JS9:
             """
             raise ValueError('GetNumpy not defined (numpy not found)')
 
+        @staticmethod
+        def GetDisplayNumpy():
+            """
+            This method is not defined because numpy in not installed.
+            """
+            raise ValueError('GetDisplayNumpy not defined (numpy not found)')
+
         @staticmethod
         def SetNumpy():
             """
@@ -935,6 +2036,34 @@ class JS9:
         """
         return self.send({'cmd': 'GetDisplayData', 'args': args})
 
+    def RawDataLayer(self, *args):
+        """
+        Manage raw data layers
+
+        call:
+
+        rawid  = JS9.RawDataLayer(opts)
+
+        where:
+
+        - opts: optional layer properties (e.g. the id of a raw data layer
+          to switch to)
+
+        returns:
+
+        - rawid: id of the current raw data layer
+
+        JS9 keeps the original image data as the "raw0" raw data layer, and
+        can hold additional layers derived from it (e.g. by analysis
+        plugins). Called without arguments, this routine returns the id of
+        the current raw data layer. Passing the id of an existing layer
+        makes it the current one.
+
+        NB: the form of this call that creates a new layer takes a
+        javascript function, which can't be sent from Python.
+        """
+        return self.send({'cmd': 'RawDataLayer', 'args': args})
+
     def DisplayPlugin(self, *args):
         """
         Display plugin in a light window
@@ -1552,6 +2681,10 @@ class JS9:
 
         sets the opacity of red pixels to 0.5, turns on the green pixels,
         and turns off the blue pixels in the currently active static colormap.
+
+        NB: In Python, the min and max values can be numpy scalars and arrays
+        (e.g. per-band thresholds from numpy.percentile()): these are encoded
+        directly, without first converting them with tolist().
         """
         return self.send({'cmd': 'SetColormap', 'args': args})
 
@@ -1811,6 +2944,42 @@ class JS9:
         """
         return self.send({'cmd': 'SetRGBMode', 'args': args})
 
+    def GetImageInherit(self, *args):
+        """
+        Get the image inherit mode
+
+        call:
+
+        mode  = JS9.GetImageInherit()
+
+        returns:
+
+        - mode: boolean specifying whether new images inherit settings
+
+        When image inherit mode is true, a new image loaded into the display
+        inherits the pan, zoom, colormap and scale settings of the image
+        currently displayed.
+        """
+        return self.send({'cmd': 'GetImageInherit', 'args': args})
+
+    def SetImageInherit(self, *args):
+        """
+        Set the image inherit mode
+
+        call:
+
+        JS9.SetImageInherit(mode)
+
+        where:
+
+        - mode: boolean true or false
+
+        When image inherit mode is true, a new image loaded into the display
+        inherits the pan, zoom, colormap and scale settings of the image
+        currently displayed.
+        """
+        return self.send({'cmd': 'SetImageInherit', 'args': args})
+
     def GetOpacity(self, *args):
         """
         Get the image opacity
@@ -2225,6 +3394,43 @@ class JS9:
         """
         return self.send({'cmd': 'GetValPos', 'args': args})
 
+    def GetCrosshair(self, *args):
+        """
+        Get the position of the crosshair
+
+        call:
+
+        pos  = JS9.GetCrosshair()
+
+        returns:
+
+        - pos: object containing the x and y image position of the crosshair
+
+        The crosshair is only displayed when it has been enabled (e.g. using
+        the View menu, or JS9.SetParam("crosshair", true)) and the mouse is
+        in crosshair mode.
+        """
+        return self.send({'cmd': 'GetCrosshair', 'args': args})
+
+    def SetCrosshair(self, *args):
+        """
+        Set the position of the crosshair
+
+        call:
+
+        JS9.SetCrosshair(x, y)
+
+        where:
+
+        - x: image x position
+        - y: image y position
+
+        Move the crosshair to the specified image position. As with
+        GetCrosshair(), the crosshair must be enabled for this to have any
+        effect.
+        """
+        return self.send({'cmd': 'SetCrosshair', 'args': args})
+
     def PixToWCS(self, *args):
         """
         Convert image pixel position to WCS position
@@ -2277,6 +3483,60 @@ class JS9:
         """
         return self.send({'cmd': 'WCSToPix', 'args': args})
 
+    def PixToWCSMany(self, xs, ys, *args):
+        """
+        Convert a list of image pixel positions to WCS positions
+
+        call:
+
+        wcsobjs  = JS9.PixToWCSMany(xs, ys)
+
+        where:
+
+        -  xs: list (or numpy array) of x image coordinates
+        -  ys: list (or numpy array) of y image coordinates
+
+        returns:
+
+        -  wcsobjs: list of world coordinate system objects (see PixToWCS)
+
+        NB: This is a pyjs9 routine, not part of the JS9 Public API. The
+        PixToWCS() calls for all of the positions are sent together using
+        sendmany(), so that (with the socketio transport) converting many
+        positions costs about one round trip instead of one per position.
+        """
+        if len(xs) != len(ys):
+            raise ValueError('PixToWCSMany: xs and ys must have the same '
+                             'length')
+        return self.sendmany([{'cmd': 'PixToWCS', 'args': (x, y) + args}
+                              for x, y in zip(xs, ys)])
+
+    def WCSToPixMany(self, ras, decs, *args):
+        """
+        Convert a list of WCS positions to image pixel positions
+
+        call:
+
+        pixobjs  = JS9.WCSToPixMany(ras, decs)
+
+        where:
+
+        -  ras: list (or numpy array) of right ascensions in degrees
+        -  decs: list (or numpy array) of declinations in degrees
+
+        returns:
+
+        -  pixobjs: list of pixel objects (see WCSToPix)
+
+        NB: This is a pyjs9 routine, not part of the JS9 Public API. As with
+        PixToWCSMany(), the WCSToPix() calls are sent together.
+        """
+        if len(ras) != len(decs):
+            raise ValueError('WCSToPixMany: ras and decs must have the same '
+                             'length')
+        return self.sendmany([{'cmd': 'WCSToPix', 'args': (ra, dec) + args}
+                              for ra, dec in zip(ras, decs)])
+
     def ImageToDisplayPos(self, *args):
         """
         Get the display coordinates from the image coordinates
@@ -3590,9 +4850,54 @@ class JS9:
         -  fontSize: font parameter for text region
         -  fontStyle: font parameter for text region
         -  fontWeight: font parameter for text region
+
+        NB: In Python, region properties such as pts, points and radii can
+        be numpy arrays (and positions can be numpy scalars): these are
+        encoded directly, without first converting them with tolist().
+        To add many regions from arrays of positions and sizes, see
+        AddRegionsArrays().
         """
         return self.send({'cmd': 'AddRegions', 'args': args})
 
+    def AddRegionsArrays(self, shape, opts=None, **props):
+        """
+        Add regions of one shape from arrays of region properties
+
+        call:
+
+        id  = JS9.AddRegionsArrays(shape, opts, prop=arr, ...)
+
+        where:
+
+        -  shape: region shape ('circle', 'box', 'point', etc.)
+        -  opts: global values to apply to each created region
+        -  prop=arr: list (or numpy array) of values of a region property,
+           one per region, e.g. x=xs, y=ys, radius=rs (see AddRegions)
+
+        returns:
+
+        -  id: id of last region created
+
+        NB: This is a pyjs9 routine, not part of the JS9 Public API. All of
+        the property arrays must have the same length. Each numpy array is
+        converted to a list in a single pass (rather than element by
+        element), and all of the regions are added by one AddRegions()
+        call. For example, to overlay a catalog:
+
+          >>> j.AddRegionsArrays('circle', {'color': 'red'},
+                                 x=cat['x'], y=cat['y'], radius=3*cat['fwhm'])
+        """
+        keys = list(props)
+        cols = [v.tolist() if hasattr(v, 'tolist') else list(v)
+                for v in props.values()]
+        if len({len(col) for col in cols}) > 1:
+            raise ValueError('AddRegionsArrays: property arrays must all '
+                             'have the same length')
+        rarr = [dict(zip(keys, row), shape=shape) for row in zip(*cols)]
+        if opts is None:
+            return self.AddRegions(rarr)
+        return self.AddRegions(rarr, opts)
+
     def GetRegions(self, *args):
         """
         Get information about one or more regions
@@ -3638,6 +4943,43 @@ class JS9:
         """
         return self.send({'cmd': 'GetRegions', 'args': args})
 
+    def GetRegionsArrays(self, props, *args):
+        """
+        Get region properties as arrays, one per property
+
+        call:
+
+        cols  = JS9.GetRegionsArrays(props, regions)
+
+        where:
+
+        -  props: list of region property names (e.g. ['id', 'x', 'y'])
+        -  regions: which regions to retrieve (see GetRegions)
+
+        returns:
+
+        -  cols: dictionary of numpy arrays (or lists, if numpy is not
+           installed) of the values of each property, one per region
+
+        NB: This is a pyjs9 routine, not part of the JS9 Public API. The
+        regions are retrieved by one GetRegions() call and their properties
+        then are gathered into columns, so that they can be worked on with
+        vectorized numpy operations (a missing property is None). Properties
+        whose values are not numbers or strings (e.g. the pts of polygons)
+        are returned as 1-D object arrays, holding one value per region.
+        Include 'id' in props to pass the results back to
+        ChangeRegionsArrays():
+
+          >>> cols = j.GetRegionsArrays(['id', 'radius'], 'circle')
+          >>> j.ChangeRegionsArrays(cols['id'], radius=2 * cols['radius'])
+        """
+        rarr = self.GetRegions(*args) or []
+        cols = {prop: [r.get(prop) for r in rarr] for prop in props}
+        if js9Globals['numpy']:
+            _load_numpy()
+            cols = {prop: _np_column(col) for prop, col in cols.items()}
+        return cols
+
     def ListRegions(self, *args):
         """
         List one or more regions
@@ -3765,6 +5107,37 @@ class JS9:
         """
         return self.send({'cmd': 'ChangeRegions', 'args': args})
 
+    def ChangeRegionsArrays(self, ids, **props):
+        """
+        Change regions from arrays of region properties
+
+        call:
+
+        JS9.ChangeRegionsArrays(ids, prop=arr, ...)
+
+        where:
+
+        -  ids: list (or numpy array) of the ids of the regions to change
+        -  prop=arr: list (or numpy array) of new values of a region
+           property, one per region, e.g. x=xs, y=ys (see AddRegions)
+
+        NB: This is a pyjs9 routine, not part of the JS9 Public API. All of
+        the arrays must have the same length. Each region gets its own
+        ChangeRegions() call, but the calls are sent together using
+        sendmany(), so that (with the socketio transport) changing many
+        regions costs about one round trip. See GetRegionsArrays().
+        """
+        keys = list(props)
+        cols = [v.tolist() if hasattr(v, 'tolist') else list(v)
+                for v in props.values()]
+        ids = ids.tolist() if hasattr(ids, 'tolist') else list(ids)
+        if len({len(col) for col in cols} | {len(ids)}) > 1:
+            raise ValueError('ChangeRegionsArrays: ids and property arrays '
+                             'must all have the same length')
+        return self.sendmany([{'cmd': 'ChangeRegions',
+                               'args': (rid, dict(zip(keys, row)))}
+                              for rid, row in zip(ids, zip(*cols))])
+
     def CopyRegions(self, *args):
         """
         Copy one or more regions to another image
@@ -4180,7 +5553,12 @@ class JS9:
             also can be changed by users via the Catalog tab in the
             Preferences plugin.
 
+            NB: In Python, the table also can be an astropy Table or a pandas
+            DataFrame: it is sent as tab-delimited text.
+
             """
+        if len(args) > 1:
+            args = (args[0], _table_str(args[1])) + args[2:]
         return self.send({'cmd': 'LoadCatalog', 'args': args})
 
     def SaveCatalog(self, *args):
@@ -4265,6 +5643,26 @@ class JS9:
         """
         return self.send({'cmd': 'RunAnalysis', 'args': args})
 
+    def SaveFITS(self, *args):
+        """
+        Save image as a FITS file
+
+        call:
+
+        JS9.SaveFITS(filename)
+
+        where:
+
+        - filename: output file name
+
+        Save the currently displayed image as a FITS file, via the browser.
+        If filename is not specified, the file will be saved as "js9.fits".
+
+        NB: In Python, you probably want to call JS9.GetFITS() to retrieve
+        the image as an astropy (or pyfits) HDU list instead.
+        """
+        return self.send({'cmd': 'SaveFITS', 'args': args})
+
     def SavePNG(self, *args):
         """
         Save image as a PNG file
@@ -4860,7 +6258,7 @@ class JS9:
         """
         return self.send({'cmd': 'analysis', 'args': args})
 
-    def colormap(self, *args):
+    def colormap(self, *args, parsed=False):
         """
         set/get colormap for current image
 
@@ -4870,10 +6268,14 @@ class JS9:
           - with arguments, the setter is called to set current values.
 
         Returned results are of type string: 'colormap contrast bias'
+        With parsed=True, the getter returns a Cmap(colormap, contrast, bias) tuple instead.
         """
-        return self.send({'cmd': 'colormap', 'args': args})
+        res = self.send({'cmd': 'colormap', 'args': args})
+        if parsed and not args:
+            return _parse_reply(Cmap, res)
+        return res
 
-    def cmap(self, *args):
+    def cmap(self, *args, parsed=False):
         """
         set/get colormap for current image (alias)
 
@@ -4883,8 +6285,12 @@ class JS9:
           - with arguments, the setter is called to set current values.
 
         Returned results are of type string: 'colormap contrast bias'
+        With parsed=True, the getter returns a Cmap(colormap, contrast, bias) tuple instead.
         """
-        return self.send({'cmd': 'cmap', 'args': args})
+        res = self.send({'cmd': 'cmap', 'args': args})
+        if parsed and not args:
+            return _parse_reply(Cmap, res)
+        return res
 
     def colormaps(self, *args):
         """
@@ -4892,6 +6298,8 @@ class JS9:
 
         No setter routine is provided.
         Returned results are of type string: 'grey, red, ...'
+        The list is fetched just once: later calls return it from a cache
+        (see clear_caps_cache() for colormaps added by others).
         """
         return self.send({'cmd': 'colormaps', 'args': args})
 
@@ -4923,15 +6331,55 @@ class JS9:
         """
         return self.send({'cmd': 'images', 'args': args})
 
+    def image_all(self, *args):
+        """
+        get info for all currently loaded images
+
+        No setter routine is provided.
+        Returned results are a dictionary of image data objects (as returned
+        by GetImageData(false), i.e. without the image data), keyed by image
+        id. The images are all described in a single call to JS9 (see
+        GetDisplayData), rather than in one call per image.
+        """
+        imarr = self.GetDisplayData(False, *args)
+        # if too much was returned, we can get back an empty string
+        if imarr == '':
+            raise ValueError('GetDisplayData failed: no reply from JS9?')
+        return {im['id']: im for im in imarr}
+
     def load(self, *args):
         """
         load image(s)
 
         No getter routine is provided.
-        """
+        A numpy array or a fits hdulist also can be loaded, optionally
+        followed by a dictionary of Load() opts (filename, display, etc.):
+        it is sent by SetNumpy() (as base64-encoded raw pixels in an hdu
+        object) or SetFITS() (as base64-encoded FITS data), rather than as a
+        json list.
+        """
+        if args and not isinstance(args[0], str):
+            # check cheaply first, so that numpy and fits aren't imported
+            # unless they are already in use (the flags also guard against
+            # the stubs defined when numpy or fits is missing)
+            # pylint: disable=too-many-function-args, unexpected-keyword-arg
+            if js9Globals['numpy'] and hasattr(args[0], '__array_interface__'):
+                setter = self.SetNumpy
+            elif js9Globals['fits'] and hasattr(args[0], 'writeto') and \
+                 isinstance(args[0], _load_fits().HDUList):
+                setter = self.SetFITS
+            else:
+                setter = None
+            if setter is not None:
+                if len(args) > 2 or \
+                   (len(args) == 2 and not isinstance(args[1], dict)):
+                    raise ValueError('load() of an array or hdulist takes '
+                                     'only an opts dictionary after it')
+                return setter(args[0], opts=args[1] if len(args) == 2
+                              else None)
         return self.send({'cmd': 'load', 'args': args})
 
-    def pan(self, *args):
+    def pan(self, *args, parsed=False):
         """
         set/get pan location for current image
 
@@ -4941,8 +6389,12 @@ class JS9:
           - with arguments, the setter is called to set current values.
 
         Returned results are of type string: 'x y'
+        With parsed=True, the getter returns a Pan(x, y) tuple instead.
         """
-        return self.send({'cmd': 'pan', 'args': args})
+        res = self.send({'cmd': 'pan', 'args': args})
+        if parsed and not args:
+            return _parse_reply(Pan, res)
+        return res
 
     def regcnts(self, *args):
         """
@@ -4982,7 +6434,7 @@ class JS9:
         """
         return self.send({'cmd': 'regions', 'args': args})
 
-    def resize(self, *args):
+    def resize(self, *args, parsed=False):
         """
         set/get size of the JS9 display
 
@@ -4992,10 +6444,14 @@ class JS9:
           - with arguments, the setter is called to set current values.
 
         Returned results are of type string: 'width height'
+        With parsed=True, the getter returns a Size(width, height) tuple instead.
         """
-        return self.send({'cmd': 'resize', 'args': args})
+        res = self.send({'cmd': 'resize', 'args': args})
+        if parsed and not args:
+            return _parse_reply(Size, res)
+        return res
 
-    def scale(self, *args):
+    def scale(self, *args, parsed=False):
         """
         set/get scaling for current image
 
@@ -5005,8 +6461,12 @@ class JS9:
           - with arguments, the setter is called to set current values.
 
         Returned results are of type string: 'scale scalemin scalemax'
+        With parsed=True, the getter returns a Scale(scale, min, max) tuple instead.
         """
-        return self.send({'cmd': 'scale', 'args': args})
+        res = self.send({'cmd': 'scale', 'args': args})
+        if parsed and not args:
+            return _parse_reply(Scale, res)
+        return res
 
     def scales(self, *args):
         """
@@ -5014,6 +6474,7 @@ class JS9:
 
         No setter routine is provided.
         Returned results are of type string: 'linear, log, ...'
+        The list is fetched just once: later calls return it from a cache.
         """
         return self.send({'cmd': 'scales', 'args': args})
 
@@ -5049,6 +6510,7 @@ class JS9:
 
         No setter routine is provided.
         Returned results are of type string: 'FK4, FK5, ...'
+        The list is fetched just once: later calls return it from a cache.
         """
         return self.send({'cmd': 'wcssystems', 'args': args})
 
@@ -5058,6 +6520,7 @@ class JS9:
 
         No setter routine is provided.
         Returned results are of type string: 'degrees, ...'
+        The list is fetched just once: later calls return it from a cache.
         """
         return self.send({'cmd': 'wcsunits', 'args': args})
 